@@ -0,0 +1,131 @@
+import asyncio
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from sql.database import FacebookArchiveDatabase
+from zip.facebookarchive import import_archive
+
+ImportProgress = namedtuple("ImportProgress", ["message_file", "completed", "total"])
+ImportProgress.__doc__ = """ Progress of an import, reported after each message file is committed. """
+
+
+class AsyncArchiveImporter(object):
+    """ Imports Facebook archives into SQLite databases without blocking the asyncio event loop. """
+
+    __slots__ = ["executor", "max_concurrent_imports", "import_limit"]
+
+    def __init__(self, max_concurrent_imports=1, executor=None):
+        """
+        Create an importer which can be shared between many concurrent import requests.
+        :param max_concurrent_imports: Maximum number of imports to run at once. Further imports wait for a free slot.
+        :param executor: Executor to read and decode message files in, the event loop's default executor if not supplied.
+        """
+        if max_concurrent_imports < 1:
+            raise ValueError("At least one concurrent import must be allowed.")
+        self.executor = executor
+        self.max_concurrent_imports = max_concurrent_imports
+        self.import_limit = None  # Created on first use, as before Python 3.10 a semaphore binds to the current loop
+
+    async def import_archive(self, location, database_location, resume=False, fold_text=False,
+                             progress_callback=None):
+        """
+        Import an archive into a database file.
+        Cancelling the import stops it after the message file currently being written, which is still committed, so
+        the import can later be continued with resume.
+        :param location: Path to the Facebook archive ZIP.
+        :param database_location: Path to the database file to create.
+        :param resume: Continue an interrupted import into an existing database file.
+        :param fold_text: Also store case-folded message content.
+        :param progress_callback: Called with an ImportProgress after each message file is committed.
+        :return: Number of message files imported.
+        """
+        imported = 0
+        progress_reports = self.iter_import(location, database_location, resume=resume, fold_text=fold_text)
+        try:
+            async for progress in progress_reports:
+                imported += 1
+                if progress_callback:
+                    progress_callback(progress)
+        finally:
+            await progress_reports.aclose()
+        return imported
+
+    async def iter_import(self, location, database_location, resume=False, fold_text=False):
+        """
+        Import an archive into a database file, yielding an ImportProgress after each message file is committed.
+        Callers which stop iterating early must aclose() the iterator, which releases the import slot and closes the
+        database. Otherwise these are held until the iterator is garbage collected.
+        :param location: Path to the Facebook archive ZIP.
+        :param database_location: Path to the database file to create.
+        :param resume: Continue an interrupted import into an existing database file.
+        :param fold_text: Also store case-folded message content.
+        """
+        loop = _get_running_loop()
+        if self.import_limit is None:
+            self.import_limit = asyncio.Semaphore(self.max_concurrent_imports)
+        async with self.import_limit:
+            archive = await loop.run_in_executor(self.executor, partial(import_archive, location, fold_text=fold_text))
+
+            # SQLite connections may only be used from the thread that created them, so every database call for this
+            # import goes through a dedicated single thread.
+            database_executor = ThreadPoolExecutor(max_workers=1)
+            database = None
+            next_conversation = None
+            try:
+                database = await loop.run_in_executor(database_executor, _open_database, archive, database_location,
+                                                      resume)
+                pending_message_files = await loop.run_in_executor(database_executor,
+                                                                   database.get_pending_message_files)
+                total = len(archive.get_message_file_list())
+                completed = total - len(pending_message_files)
+
+                if pending_message_files:
+                    next_conversation = self._parse(loop, archive, pending_message_files[0])
+                for index, message_file in enumerate(pending_message_files):
+                    # Awaiting an already parsed file does not yield to the loop, so give a cancellation requested
+                    # since the last file the chance to stop the import before another file is written.
+                    await asyncio.sleep(0)
+                    conversation = await next_conversation
+                    # Read and decode the next file while this one is written.
+                    next_conversation = None
+                    if index + 1 < len(pending_message_files):
+                        next_conversation = self._parse(loop, archive, pending_message_files[index + 1])
+                    await loop.run_in_executor(database_executor, database.import_message_file, message_file,
+                                               conversation)
+                    completed += 1
+                    yield ImportProgress(message_file, completed, total)
+
+                await loop.run_in_executor(database_executor, database.close)
+                database = None
+            finally:
+                if next_conversation is not None:
+                    next_conversation.cancel()
+                if database is not None:
+                    # Queued behind any write still in progress, without blocking the event loop.
+                    database_executor.submit(database.close)
+                database_executor.shutdown(wait=False)
+
+    def _parse(self, loop, archive, message_file):
+        return loop.run_in_executor(self.executor, archive.parse_message_file, message_file)
+
+
+def _open_database(archive, database_location, resume):
+    """
+    Open the database for an archive, creating its tables if necessary.
+    :return: FacebookArchiveDatabase for the archive.
+    """
+    database = FacebookArchiveDatabase(archive, database_location=database_location, resume=resume)
+    if not database.tables_created:
+        database.create_tables(show_progress=False)
+    return database
+
+
+def _get_running_loop():
+    """
+    Get the event loop running the current coroutine.
+    asyncio.get_running_loop was added in Python 3.7, before which get_event_loop returns the running loop when called
+    from a coroutine.
+    """
+    get_running_loop = getattr(asyncio, "get_running_loop", asyncio.get_event_loop)
+    return get_running_loop()
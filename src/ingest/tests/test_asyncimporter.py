@@ -0,0 +1,94 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from ingest.asyncimporter import AsyncArchiveImporter
+from zip.tests.archivebuilder import write_archive, build_conversation
+
+
+class TestAsyncArchiveImporter(unittest.TestCase):
+    """ Tests importing archives from an asyncio event loop. """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.archive_location = os.path.join(self.directory.name, "archive.zip")
+        self.database_location = os.path.join(self.directory.name, "messages.db")
+        write_archive(self.archive_location, {
+            f"conversation_{index}": build_conversation(f"Conversation {index}", ["Hello"]) for index in range(3)
+        })
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+        self.directory.cleanup()
+
+    def _count_messages(self):
+        with sqlite3.connect(self.database_location) as connection:
+            return connection.execute("SELECT COUNT(*) FROM Messages").fetchone()[0]
+
+    def test_import_reports_progress(self):
+        """ Tests that every message file is imported and reported to the progress callback. """
+        progress_reports = []
+        importer = AsyncArchiveImporter()
+        imported = self.loop.run_until_complete(importer.import_archive(self.archive_location,
+                                                                        self.database_location,
+                                                                        progress_callback=progress_reports.append))
+
+        self.assertEqual(imported, 3)
+        self.assertEqual([(progress.completed, progress.total) for progress in progress_reports],
+                         [(1, 3), (2, 3), (3, 3)])
+        self.assertEqual(self._count_messages(), 3)
+
+    def test_cancelled_import_can_resume(self):
+        """ Tests that a cancelled import keeps its completed files and can be continued. """
+        importer = AsyncArchiveImporter()
+
+        def cancel_after_first_file(_):
+            task.cancel()
+
+        task = self.loop.create_task(importer.import_archive(self.archive_location, self.database_location,
+                                                             progress_callback=cancel_after_first_file))
+        with self.assertRaises(asyncio.CancelledError):
+            self.loop.run_until_complete(task)
+
+        imported = self.loop.run_until_complete(importer.import_archive(self.archive_location,
+                                                                        self.database_location, resume=True))
+        self.assertEqual(imported, 2)
+        self.assertEqual(self._count_messages(), 3)
+
+    def test_concurrent_imports_are_limited(self):
+        """ Tests that an import waits for a free slot, with the importer created before the event loop runs. """
+        importer = AsyncArchiveImporter(max_concurrent_imports=1)
+        other_database_location = os.path.join(self.directory.name, "other.db")
+        progress_reports = []
+
+        async def import_both():
+            return await asyncio.gather(
+                importer.import_archive(self.archive_location, self.database_location,
+                                        progress_callback=lambda _: progress_reports.append("first")),
+                importer.import_archive(self.archive_location, other_database_location,
+                                        progress_callback=lambda _: progress_reports.append("second")))
+
+        self.assertEqual(self.loop.run_until_complete(import_both()), [3, 3])
+        self.assertEqual(progress_reports, ["first"] * 3 + ["second"] * 3)
+
+    def test_stopping_iteration_early_releases_import(self):
+        """ Tests that closing the progress iterator early releases the import slot and keeps completed files. """
+        importer = AsyncArchiveImporter()
+
+        async def import_first_file():
+            progress_reports = importer.iter_import(self.archive_location, self.database_location)
+            try:
+                async for _ in progress_reports:
+                    break
+            finally:
+                await progress_reports.aclose()
+            return importer.import_limit.locked()
+
+        self.assertFalse(self.loop.run_until_complete(import_first_file()))
+        imported = self.loop.run_until_complete(importer.import_archive(self.archive_location,
+                                                                        self.database_location, resume=True))
+        self.assertEqual(imported, 2)
+        self.assertEqual(self._count_messages(), 3)
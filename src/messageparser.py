@@ -1,9 +1,8 @@
 import argparse
 import logging
-
-from sql.database import FacebookArchiveDatabase
-from sql.query import Query
-from zip.facebookarchive import import_archive
+import sys
+import time
+from contextlib import contextmanager
 
 
 def _parse_arguments():
@@ -13,9 +12,19 @@ def _parse_arguments():
     """
     parser = argparse.ArgumentParser()
     parser.add_argument("archive", help="Path to the Facebook archive ZIP.")
-    parser.add_argument("--output", help="Path to the database file to create.")
+    parser.add_argument("--output", help="Path to the database file to create.", default=":memory:")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted import into an existing output database.")
+    parser.add_argument("--fold-text", action="store_true",
+                        help="Also store case-folded message content for case-insensitive matching.")
+    parser.add_argument("--no-progress", action="store_true", help="Do not display progress bars.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Report the wall time of each phase, including imports, and the slowest functions.")
     parser.add_argument("--log", help="Logging detail level.", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"])
-    return parser.parse_args()
+    arguments = parser.parse_args()
+    if arguments.resume and arguments.output == ":memory:":
+        parser.error("--resume requires --output, the database to continue importing into.")
+    return arguments
 
 
 def _set_logging_level():
@@ -24,10 +33,70 @@ def _set_logging_level():
         logging.basicConfig(level=numeric_level)
 
 
+@contextmanager
+def _timed_phase(name, phase_times):
+    """
+    Record the wall time taken by a phase of the run.
+    :param name: Name of the phase.
+    :param phase_times: Dictionary of phase names to wall times in seconds, updated with this phase.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phase_times[name] = time.perf_counter() - start
+
+
+def _run(phase_times):
+    """
+    Convert the archive into a database.
+    The archive and database modules are imported here rather than at startup, so that argument handling stays fast
+    and their import time can be profiled.
+    :param phase_times: Dictionary to record the wall time of each phase in.
+    """
+    show_progress = not args.no_progress
+    with _timed_phase("Imports", phase_times):
+        from sql.database import FacebookArchiveDatabase
+        from zip.facebookarchive import import_archive
+    with _timed_phase("Opening archive", phase_times):
+        archive = import_archive(args.archive, fold_text=args.fold_text)
+    with _timed_phase("Opening database", phase_times):
+        database = FacebookArchiveDatabase(archive, database_location=args.output, resume=args.resume)
+    with _timed_phase("Creating tables", phase_times):
+        if not database.tables_created:
+            database.create_tables(show_progress=show_progress)
+    with _timed_phase("Populating", phase_times):
+        database.populate(show_progress=show_progress)
+
+
+def _run_profiled(hotspot_count=20):
+    """
+    Convert the archive into a database under cProfile, then report phase wall times and hotspots on stderr.
+    Phase wall times include the overhead of the profiler.
+    :param hotspot_count: Number of functions to report, ordered by cumulative time.
+    """
+    import cProfile
+    import pstats
+
+    phase_times = {}
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        _run(phase_times)
+    finally:
+        profiler.disable()
+        print("Phase wall times:", file=sys.stderr)
+        for name, seconds in phase_times.items():
+            print(f"  {name:<20} {seconds:10.3f}s", file=sys.stderr)
+        print(f"  {'Total':<20} {sum(phase_times.values()):10.3f}s", file=sys.stderr)
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(hotspot_count)
+
+
 if __name__ == '__main__':
     args = _parse_arguments()
     _set_logging_level()
 
-    database = FacebookArchiveDatabase(import_archive(args.archive), database_location=args.output)
-    database.create_tables()
-    database.populate()
+    if args.profile:
+        _run_profiled()
+    else:
+        _run({})
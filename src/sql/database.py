@@ -3,14 +3,13 @@ import os
 import sqlite3
 import uuid
 
-from tqdm import tqdm
-
-from sql.errors import TablesNotCreatedError
+from sql.errors import TablesNotCreatedError, DatabaseNotResumableError
 from sql.query import get_query_create_table, get_query_insert_into_table, get_query_unique_index, \
-    get_query_lookup_actor_id
+    get_query_lookup_actor_id, get_query_list_tables, get_query_lookup_completed_message_files, Query
 from sql.tabledetails import TABLE_DETAILS_LIST, ACTOR_TABLE_DETAILS, \
-    CONVERSATION_TABLE_DETAILS, MESSAGE_TABLE_DETAILS
+    CONVERSATION_TABLE_DETAILS, MESSAGE_TABLE_DETAILS, IMPORT_PROGRESS_TABLE_DETAILS
 from zip.facebookarchive import FacebookArchive
+from zip.textnormalisation import FOLDED_CONTENT
 
 
 class FacebookArchiveDatabase(object):
@@ -18,23 +17,49 @@ class FacebookArchiveDatabase(object):
 
     __slots__ = ["database_location", "archive", "connection", "table_details", "tables_created"]
 
-    def __init__(self, archive: FacebookArchive, database_location=":memory:"):
+    def __init__(self, archive: FacebookArchive, database_location=":memory:", resume=False):
         """
-        Create an empty database.
+        Create an empty database, or reopen a partially populated one.
         :param archive: Some FacebookArchive to model in SQLite.
         :param database_location: Path to store database, in memory by default.
+        :param resume: Reopen an existing database file and continue populating it from the last completed message file.
+        :raises DatabaseNotResumableError: The existing database has only some of the tables, e.g. it was created by a
+        version which did not record import progress.
         """
-        if os.path.exists(database_location):
-            raise FileExistsError("Database file already exists.")
+        if os.path.exists(database_location) and not resume:
+            raise FileExistsError("Database file already exists. Use resume to continue a previous import.")
         self.database_location = database_location
         self.archive = archive
         self.connection = sqlite3.connect(database_location)
+        self._configure_connection()
         self.table_details = None
-        self.tables_created = False
+        self.tables_created = self._tables_exist()
 
-    def create_tables(self):
-        """Create the tables."""
-        for table_details in tqdm(TABLE_DETAILS_LIST, desc="Creating Tables", unit="tables"):
+    def _configure_connection(self):
+        """
+        Use a write-ahead log without syncing on every commit. Each message file is committed separately so that an
+        interrupted import can be resumed, and this keeps those commits from costing an fsync each.
+        """
+        Query("PRAGMA journal_mode=WAL").run(self.connection)
+        Query("PRAGMA synchronous=NORMAL").run(self.connection)
+
+    def _tables_exist(self):
+        """Determine whether every table has already been created, e.g. by an earlier import."""
+        existing_tables = {row[0] for row in get_query_list_tables().run(self.connection)}
+        missing_tables = [table_details["name"] for table_details in TABLE_DETAILS_LIST
+                          if table_details["name"] not in existing_tables]
+        if missing_tables and len(missing_tables) < len(TABLE_DETAILS_LIST):
+            self.connection.close()
+            raise DatabaseNotResumableError(f"Database is missing the {', '.join(missing_tables)} table(s) and cannot "
+                                            f"be resumed. Delete it and start the import again.")
+        return not missing_tables
+
+    def create_tables(self, show_progress=True):
+        """
+        Create the tables.
+        :param show_progress: Display a progress bar on stderr.
+        """
+        for table_details in _progress(TABLE_DETAILS_LIST, show_progress, desc="Creating Tables", unit="tables"):
             self._create_table(table_details)
         self.connection.commit()
         self.tables_created = True
@@ -51,24 +76,70 @@ class FacebookArchiveDatabase(object):
         if unique_index_query:
             unique_index_query.run(self.connection)
 
-    def populate(self, create_tables=False):
+    def populate(self, create_tables=False, show_progress=True):
         """
         Populate the database using the supplied archive.
         :param create_tables: Create tables automatically before population.
+        :param show_progress: Display a progress bar on stderr.
         """
         if not self.tables_created:
             if create_tables:
-                self.create_tables()
+                self.create_tables(show_progress=show_progress)
             else:
                 raise TablesNotCreatedError("Tables must be created before population")
 
-        for message_file in tqdm(self.archive.get_message_file_list(), desc="Processing Message Files", unit="files"):
-            self._process_message_file(message_file)
-        self.connection.commit()
+        message_files = self.archive.get_message_file_list()
+        pending_message_files = self.get_pending_message_files()
+        for message_file in _progress(pending_message_files, show_progress, desc="Processing Message Files",
+                                      unit="files", total=len(message_files),
+                                      initial=len(message_files) - len(pending_message_files)):
+            self.import_message_file(message_file)
 
-    def _process_message_file(self, message_file):
+    def get_pending_message_files(self):
+        """
+        Get the message files in the archive which have not yet been imported.
+        :return: A list of message file paths, in archive order.
+        """
+        message_files = self.archive.get_message_file_list()
+        completed_message_files = self._get_completed_message_files()
+        if completed_message_files:
+            logging.info(f"Resuming import, skipping {len(completed_message_files)} completed files")
+        return [item for item in message_files if item not in completed_message_files]
+
+    def import_message_file(self, message_file, conversation=None):
+        """
+        Import a single message file and commit it, recording the file as completed.
+        :param message_file: Path to the message file within the archive.
+        :param conversation: The already parsed message file, parsed from the archive if not supplied.
+        """
+        self._process_message_file(message_file, conversation)
+        self._mark_message_file_completed(message_file)
+        self.connection.commit()  # One transaction per file, so an interruption loses at most the current file
+
+    def close(self):
+        """Close the connection to the database."""
+        self.connection.close()
+
+    def _get_completed_message_files(self):
+        """Get the set of message files which were fully imported by an earlier run."""
+        return {row[0] for row in get_query_lookup_completed_message_files().run(self.connection)}
+
+    def _mark_message_file_completed(self, message_file):
+        query = "UNINITIALISED"
+        try:
+            query = get_query_insert_into_table(IMPORT_PROGRESS_TABLE_DETAILS,
+                                                {
+                                                    "Message_File": message_file
+                                                },
+                                                allow_duplicates=False)
+            query.run(self.connection)
+        except sqlite3.OperationalError:
+            print("Failed to run query: " + query)
+
+    def _process_message_file(self, message_file, conversation=None):
         logging.info(f"Populating data from '{message_file}'...")
-        conversation = self.archive.parse_message_file(message_file)
+        if conversation is None:
+            conversation = self.archive.parse_message_file(message_file)
         logging.info("Modelling Conversation...")
         conversation_id = self._add_conversation(conversation)
         logging.info("Extracting actors...")
@@ -117,15 +188,16 @@ class FacebookArchiveDatabase(object):
         query = "UNINITIALISED"
         message_id = self._generate_id()
         try:
-            query = get_query_insert_into_table(MESSAGE_TABLE_DETAILS,
-                                                {
-                                                    "Message_ID": message_id,
-                                                    "Actor_ID": self._lookup_sender_id(message["sender_name"]),
-                                                    "Conversation_ID": conversation_id,
-                                                    "Timestamp": message["timestamp_ms"],
-                                                    "Content": message["content"],
-                                                },
-                                                allow_duplicates=True)
+            values = {
+                "Message_ID": message_id,
+                "Actor_ID": self._lookup_sender_id(message["sender_name"]),
+                "Conversation_ID": conversation_id,
+                "Timestamp": message["timestamp_ms"],
+                "Content": message["content"],
+            }
+            if FOLDED_CONTENT in message:
+                values["Content_Folded"] = message[FOLDED_CONTENT]
+            query = get_query_insert_into_table(MESSAGE_TABLE_DETAILS, values, allow_duplicates=True)
             query.run(self.connection)
             return message_id
         except sqlite3.OperationalError:
@@ -145,3 +217,18 @@ class FacebookArchiveDatabase(object):
     @staticmethod
     def _generate_id():
         return str(uuid.uuid4())
+
+
+def _progress(iterable, show_progress, **kwargs):
+    """
+    Wrap an iterable in a tqdm progress bar if progress should be shown.
+    tqdm is only imported when a progress bar is actually displayed, as it is slow to import.
+    :param iterable: Iterable to report progress through.
+    :param show_progress: Display a progress bar on stderr.
+    :param kwargs: Arguments for the progress bar.
+    :return: The iterable, wrapped in a progress bar if required.
+    """
+    if not show_progress:
+        return iterable
+    from tqdm import tqdm
+    return tqdm(iterable, **kwargs)
@@ -3,3 +3,7 @@ class TablesNotCreatedError(Exception):
 
     def __init__(self, *args, **kwargs):
         super(self, *args, **kwargs)
+
+
+class DatabaseNotResumableError(Exception):
+    """ The database was not created by a resumable import, so it cannot be continued. """
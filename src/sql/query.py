@@ -105,6 +105,26 @@ def get_query_lookup_actor_id(actor_name):
     return query
 
 
+def get_query_list_tables():
+    """
+    List the names of all tables present in the database.
+    :return: An SQL query which returns the name of every table.
+    """
+    query = Query("SELECT name FROM sqlite_master WHERE type='table'")
+    logging.debug(f"Generated table listing SQL query: '{str(query)}'")
+    return query
+
+
+def get_query_lookup_completed_message_files():
+    """
+    Lookup the message files which have already been fully imported.
+    :return: An SQL query which returns the path of every completed message file.
+    """
+    query = Query("SELECT Message_File FROM ImportProgress")
+    logging.debug(f"Generated completed message file lookup SQL query: '{str(query)}'")
+    return query
+
+
 def _sanitise_string(string):
     return string.replace("'", "")
 
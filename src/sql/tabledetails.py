@@ -21,6 +21,10 @@ MESSAGE_TABLE_DETAILS = {
             {
                 "name": "Content",
                 "type": "text"
+            },
+            {
+                "name": "Content_Folded",
+                "type": "text"
             }
         ]
     }
@@ -56,4 +60,16 @@ CONVERSATION_TABLE_DETAILS = {
     ]
 }
 
-TABLE_DETAILS_LIST = [MESSAGE_TABLE_DETAILS, ACTOR_TABLE_DETAILS, CONVERSATION_TABLE_DETAILS]
+IMPORT_PROGRESS_TABLE_DETAILS = {
+    "name": "ImportProgress",
+    "columns": [
+        {
+            "name": "Message_File",
+            "type": "text",
+            "attributes": ["primary", "key"]
+        }
+    ]
+}
+
+TABLE_DETAILS_LIST = [MESSAGE_TABLE_DETAILS, ACTOR_TABLE_DETAILS, CONVERSATION_TABLE_DETAILS,
+                      IMPORT_PROGRESS_TABLE_DETAILS]
@@ -0,0 +1,96 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from sql.database import FacebookArchiveDatabase
+from sql.errors import DatabaseNotResumableError
+from zip.facebookarchive import import_archive
+from zip.textnormalisation import repair_encoding
+from zip.tests.archivebuilder import write_archive, build_conversation
+
+
+class TestFacebookArchiveDatabase(unittest.TestCase):
+    """ Tests populating a database from an archive. """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.archive_location = os.path.join(self.directory.name, "archive.zip")
+        self.database_location = os.path.join(self.directory.name, "messages.db")
+        write_archive(self.archive_location, {
+            "alice_1": build_conversation("Alice", ["Hello", "How are you?"]),
+            "bob_2": build_conversation("Bob", ["Hi"]),
+        })
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _count(self, database, table_name):
+        return database.connection.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+
+    def test_existing_database_requires_resume(self):
+        """ Tests that an existing database file is only reopened when resuming. """
+        database = FacebookArchiveDatabase(import_archive(self.archive_location), self.database_location)
+        database.populate(create_tables=True)
+        database.close()
+
+        with self.assertRaises(FileExistsError):
+            FacebookArchiveDatabase(import_archive(self.archive_location), self.database_location)
+
+        resumed = FacebookArchiveDatabase(import_archive(self.archive_location), self.database_location, resume=True)
+        self.assertTrue(resumed.tables_created)
+
+    def test_resume_skips_completed_message_files(self):
+        """ Tests that resuming only imports the message files that were not completed previously. """
+        archive = import_archive(self.archive_location)
+        database = FacebookArchiveDatabase(archive, self.database_location)
+        database.create_tables()
+        first_message_file = archive.get_message_file_list()[0]
+        database.import_message_file(first_message_file)
+        database.close()
+
+        resumed = FacebookArchiveDatabase(import_archive(self.archive_location), self.database_location, resume=True)
+        resumed.populate()
+
+        self.assertEqual(self._count(resumed, "Conversations"), 2)
+        self.assertEqual(self._count(resumed, "Messages"), 3)
+        self.assertEqual(self._count(resumed, "ImportProgress"), 2)
+
+    def test_database_without_progress_is_not_resumable(self):
+        """ Tests that a database from an import which did not record its progress is refused rather than extended. """
+        with sqlite3.connect(self.database_location) as connection:
+            for table_name in ["Messages", "Actors", "Conversations"]:
+                connection.execute(f"CREATE table {table_name}(Placeholder text)")
+        connection.close()
+
+        with self.assertRaises(DatabaseNotResumableError):
+            FacebookArchiveDatabase(import_archive(self.archive_location), self.database_location, resume=True)
+
+    def test_text_is_repaired_and_folded_at_ingest(self):
+        """ Tests that mis-encoded text is repaired and folded as message files are imported. """
+        write_archive(self.archive_location, {
+            "zoe_1": build_conversation("CafÃ©", ["HÃ©LLO", "Plain"], sender_name="ZoÃ«"),
+            "bob_2": build_conversation("Bob", ["Hi"]),
+        })
+
+        database = FacebookArchiveDatabase(import_archive(self.archive_location, fold_text=True))
+        with mock.patch("zip.facebookarchive.repair_encoding", wraps=repair_encoding) as repair:
+            database.populate(create_tables=True, show_progress=False)
+        self.assertEqual(repair.call_count, 1)  # The file without escaped characters is not repaired
+
+        rows = database.connection.execute("SELECT Actor_Name, Content, Content_Folded FROM Messages "
+                                           "JOIN Actors USING (Actor_ID) ORDER BY Timestamp, Content").fetchall()
+        self.assertEqual(rows, [("Alice", "Hi", "hi"), ("Zoë", "HéLLO", "héllo"), ("Zoë", "Plain", "plain")])
+        titles = {row[0] for row in database.connection.execute("SELECT Conversation_Title FROM Conversations")}
+        self.assertEqual(titles, {"Café", "Bob"})
+
+    def test_text_repair_can_be_disabled(self):
+        """ Tests that text is stored as written when repair is disabled, and that folding is optional. """
+        write_archive(self.archive_location, {"zoe_1": build_conversation("CafÃ©", ["HÃ©LLO"], sender_name="ZoÃ«")})
+
+        database = FacebookArchiveDatabase(import_archive(self.archive_location, repair_text=False))
+        database.populate(create_tables=True, show_progress=False)
+        rows = database.connection.execute("SELECT Actor_Name, Content, Content_Folded FROM Messages "
+                                           "JOIN Actors USING (Actor_ID)").fetchall()
+        self.assertEqual(rows, [("ZoÃ«", "HÃ©LLO", None)])
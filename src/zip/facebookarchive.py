@@ -6,6 +6,7 @@ from zipfile import ZipFile
 
 from zip.archivetype import ArchiveType
 from zip.errors import InvalidArchiveError
+from zip.textnormalisation import repair_encoding, fold_message_content
 from zip.zipconstants import EXPECTED_SUBDIRECTORIES, MESSAGES
 
 
@@ -120,9 +121,16 @@ class FacebookArchive(ABC):
 
 class FacebookJsonArchive(FacebookArchive):
     """ Representation of a JSON Facebook data archive ZIP. """
-    def __init__(self, location):
+    def __init__(self, location, repair_text=True, fold_text=False):
+        """
+        :param location: Location of the archive.
+        :param repair_text: Repair the mis-encoded text Facebook writes into its JSON files as each file is parsed.
+        :param fold_text: Add a normalised, case-folded copy of each message's content as each file is parsed.
+        """
         super().__init__(location)
         self.type = ArchiveType.json
+        self.repair_text = repair_text
+        self.fold_text = fold_text
 
     def get_message_file_list(self):
         """
@@ -138,7 +146,13 @@ class FacebookJsonArchive(FacebookArchive):
         :return: Message file as dictionary.
         """
         with ZipFile(self.location, 'r') as archive:
-            return json.loads(archive.read(message_file))
+            raw_message_file = archive.read(message_file)
+        conversation = json.loads(raw_message_file)
+        if self.repair_text and b"\\u00" in raw_message_file:  # Files without escaped characters need no repair
+            repair_encoding(conversation)
+        if self.fold_text:
+            fold_message_content(conversation)
+        return conversation
 
     @staticmethod
     def _is_message_file(filename):
@@ -178,15 +192,17 @@ def _count_list_similarities(primary, proposed):
     return matches
 
 
-def import_archive(location):
+def import_archive(location, repair_text=True, fold_text=False):
     """
     Given the location of a Facebook archive, creates the appropriate archive object to represent it.
     :param location: Path to ZIP.
+    :param repair_text: Repair mis-encoded text while parsing message files.
+    :param fold_text: Add a case-folded copy of message content while parsing message files.
     :return: Some subclass of FacebookArchive.
     """
     archive_type = FacebookArchive.determine_archive_type(location)
     if archive_type == ArchiveType.json:
-        return FacebookJsonArchive(location)
+        return FacebookJsonArchive(location, repair_text=repair_text, fold_text=fold_text)
     elif archive_type == ArchiveType.html:
         raise TypeError("HTML archives are no longer supported. Please supply a JSON archive.")
     else:
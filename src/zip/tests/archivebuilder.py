@@ -0,0 +1,34 @@
+import json
+from zipfile import ZipFile
+
+from zip.zipconstants import EXPECTED_SUBDIRECTORIES
+
+
+def write_archive(location, conversations):
+    """
+    Write a minimal JSON Facebook archive containing the supplied conversations.
+    The conversations are written with escaped non-ASCII characters, as Facebook does.
+    :param location: Path to write the archive ZIP to.
+    :param conversations: Dictionary of conversation directory names to conversation dictionaries.
+    """
+    with ZipFile(location, "w") as zip_file:
+        for subdirectory in EXPECTED_SUBDIRECTORIES:
+            zip_file.writestr(f"{subdirectory}/placeholder.txt", "")
+        for name, conversation in conversations.items():
+            zip_file.writestr(f"messages/inbox/{name}/message_1.json", json.dumps(conversation, ensure_ascii=True))
+
+
+def build_conversation(title, messages, sender_name="Alice"):
+    """
+    Build a message file dictionary for a conversation in which one participant sends every message.
+    :param title: Title of the conversation.
+    :param messages: Content of each message, in order.
+    :param sender_name: Name of the participant sending the messages.
+    :return: Message file as dictionary.
+    """
+    return {
+        "title": title,
+        "participants": [{"name": sender_name}, {"name": "Bob"}],
+        "messages": [{"sender_name": sender_name, "timestamp_ms": index, "content": content}
+                     for index, content in enumerate(messages)]
+    }
@@ -0,0 +1,33 @@
+import unittest
+
+from zip.textnormalisation import repair_encoding, fold_message_content, FOLDED_CONTENT
+
+
+class TestTextNormalisation(unittest.TestCase):
+    """ Tests the repair and normalisation of message text at ingest. """
+
+    def test_repair_encoding(self):
+        # Text written by Facebook as one latin-1 character per UTF-8 byte should be decoded
+        conversation = {
+            "title": "CafÃ©",
+            "participants": [{"name": "ZoÃ«"}],
+            "messages": [{"sender_name": "ZoÃ«", "content": "ð\u009f\u0098\u0080 \"quoted\"\n"}]
+        }
+        repair_encoding(conversation)
+        self.assertEqual(conversation["title"], "Café")
+        self.assertEqual(conversation["participants"][0]["name"], "Zoë")
+        self.assertEqual(conversation["messages"][0]["content"], "\U0001F600 \"quoted\"\n")
+
+        # Strings that are not mis-encoded UTF-8 should be left as they are
+        conversation = {"title": "CafÃ©", "messages": [{"content": "Déjà vu"}, {"content": "☃"}]}
+        repair_encoding(conversation)
+        self.assertEqual(conversation["title"], "Café")
+        self.assertEqual(conversation["messages"][0]["content"], "Déjà vu")
+        self.assertEqual(conversation["messages"][1]["content"], "☃")
+
+    def test_fold_message_content(self):
+        conversation = {"messages": [{"content": "Straße"}, {"sender_name": "Alice"}, {"content": "ＨＥＬＬＯ\x00"}]}
+        fold_message_content(conversation)
+        self.assertEqual(conversation["messages"][0][FOLDED_CONTENT], "strasse")
+        self.assertNotIn(FOLDED_CONTENT, conversation["messages"][1])
+        self.assertEqual(conversation["messages"][2][FOLDED_CONTENT], "hello\x00")
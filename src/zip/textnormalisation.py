@@ -0,0 +1,61 @@
+import logging
+import unicodedata
+
+FOLDED_CONTENT = "content_folded"
+_SEPARATOR = "\x00"
+
+
+def repair_encoding(conversation):
+    """
+    Repair the text of a decoded Facebook message file.
+    Facebook writes each UTF-8 byte as its own escaped latin-1 character. The title, participant names, sender names
+    and message content are joined and re-encoded in one go rather than string by string. If that fails, because some
+    of the text is not mis-encoded UTF-8, the strings are repaired individually instead.
+    :param conversation: Decoded message file, repaired in place.
+    """
+    fields = [(conversation, "title")]
+    fields += [(participant, "name") for participant in conversation.get("participants", [])]
+    for message in conversation.get("messages", []):
+        fields += [(message, key) for key in ("sender_name", "content")]
+    fields = [(container, key) for container, key in fields if isinstance(container.get(key), str)]
+
+    texts = [container[key] for container, key in fields]
+    try:
+        repaired_texts = _repair(_SEPARATOR.join(texts)).split(_SEPARATOR)
+    except UnicodeError:
+        logging.debug("Message file contains text that is not mis-encoded UTF-8, repairing strings individually")
+        repaired_texts = None
+    if repaired_texts is None or len(repaired_texts) != len(texts):
+        repaired_texts = [_repair_if_possible(text) for text in texts]
+
+    for (container, key), repaired_text in zip(fields, repaired_texts):
+        container[key] = repaired_text
+
+
+def fold_message_content(conversation):
+    """
+    Add a normalised, case-folded copy of the content of each message in a conversation, for case-insensitive matching.
+    :param conversation: Decoded message file. Each message with content gains a folded content entry.
+    """
+    messages = [message for message in conversation["messages"] if "content" in message]
+    contents = [message["content"] for message in messages]
+    folded_contents = _fold(_SEPARATOR.join(contents)).split(_SEPARATOR)
+    if len(folded_contents) != len(contents):  # Separator present in the content itself
+        folded_contents = [_fold(content) for content in contents]
+    for message, folded_content in zip(messages, folded_contents):
+        message[FOLDED_CONTENT] = folded_content
+
+
+def _repair(text):
+    return text.encode("latin-1").decode("utf-8")
+
+
+def _repair_if_possible(text):
+    try:
+        return _repair(text)
+    except UnicodeError:
+        return text
+
+
+def _fold(text):
+    return unicodedata.normalize("NFKC", text).casefold()